@@ -0,0 +1,302 @@
+"""
+Variance-reduced power comparison for Study 1.
+
+run_power_simulation() estimates power for one design with fresh noise in
+every simulation, so the difference in power between two designs (or two
+effect-size scenarios) carries the Monte Carlo noise of both estimates.
+This script compares several designs and effect-size scenarios at once and
+can reduce that noise with:
+
+- Common random numbers (CRN): every agenda item gets its own random
+  stream keyed by (replicate, team, meeting, item). Condition assignment,
+  accountability and baseline noise for an item are therefore identical
+  across all designs and scenarios in a replicate, and a larger design
+  simply extends a smaller one with new items.
+- Antithetic draws: each replicate is fitted twice, once with baseline
+  noise z and once with -z (same assignments).
+
+For every comparison (each design vs. the first design, each scenario vs.
+the first scenario) we report the power difference, its paired Monte Carlo
+standard error, the standard error the same number of independent fits
+would have given, and the resulting variance-reduction factor.
+
+Outputs:
+- data/synthetic/power_comparison_results_study1.csv
+- fig/power_comparison_study1.csv
+- fig/power_comparison_summary_study1.txt
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import patsy
+import statsmodels.api as sm
+
+from power_simulation_study1 import (
+    BASE_MEAN,
+    BASE_SD,
+    BOUNDS,
+    CONDITIONS,
+    DEFAULT_EFFECTS,
+    FORMULA,
+    KEY_TERMS,
+    key_term_flags,
+)
+
+
+DESIGNS = [
+    dict(n_teams=6, n_meetings_per_team=4, n_items_per_meeting=5),
+    dict(n_teams=8, n_meetings_per_team=4, n_items_per_meeting=5),
+    dict(n_teams=6, n_meetings_per_team=6, n_items_per_meeting=5),
+]
+
+EFFECT_SCENARIOS = {
+    "assumed": DEFAULT_EFFECTS,
+    "half_interaction": dict(DEFAULT_EFFECTS, human_first_x_acc=0.025),
+}
+
+
+def design_label(design: dict) -> str:
+    return (
+        f"{design['n_teams']}t_{design['n_meetings_per_team']}m_"
+        f"{design['n_items_per_meeting']}i"
+    )
+
+
+def draw_common_numbers(
+    seed,
+    n_teams: int,
+    n_meetings_per_team: int,
+    n_items_per_meeting: int,
+):
+    """Draw assignments and standard-normal baseline noise per agenda item.
+
+    Each item's draws come from a stream seeded by (seed, team, meeting,
+    item), so they do not depend on the size of the surrounding design.
+    """
+    rows = []
+    for t in range(1, n_teams + 1):
+        for m in range(1, n_meetings_per_team + 1):
+            for a in range(1, n_items_per_meeting + 1):
+                rng = np.random.default_rng([*np.atleast_1d(seed), t, m, a])
+                cond_u, acc_u = rng.random(2)
+                rows.append(
+                    dict(
+                        team_id=f"T{t}",
+                        team_idx=t,
+                        meeting_idx=m,
+                        item_idx=a,
+                        sequence_condition=CONDITIONS[int(cond_u * len(CONDITIONS))],
+                        accountability=int(acc_u < 0.5),
+                        z=rng.standard_normal(),
+                    )
+                )
+
+    df = pd.DataFrame(rows)
+    df["AI_first"] = (df["sequence_condition"] == "AI_FIRST").astype(int)
+    df["Human_first"] = (df["sequence_condition"] == "HUMAN_FIRST").astype(int)
+    return df
+
+
+def restrict_to_design(draws: pd.DataFrame, design: dict) -> pd.DataFrame:
+    mask = (
+        (draws["team_idx"] <= design["n_teams"])
+        & (draws["meeting_idx"] <= design["n_meetings_per_team"])
+        & (draws["item_idx"] <= design["n_items_per_meeting"])
+    )
+    return draws[mask].reset_index(drop=True)
+
+
+def outcome_from_common_numbers(
+    draws: pd.DataFrame,
+    effects: dict,
+    noise_sign: float = 1.0,
+):
+    """junior_talk_share implied by the drawn numbers under `effects`."""
+    hf = draws["Human_first"].to_numpy()
+    ai = draws["AI_first"].to_numpy()
+    acc = draws["accountability"].to_numpy()
+
+    delta = (
+        effects["human_first"] * hf
+        + effects["ai_first"] * ai
+        + effects["accountability"] * acc
+        + effects["human_first_x_acc"] * hf * acc
+    )
+    base = BASE_MEAN + noise_sign * BASE_SD * draws["z"].to_numpy()
+    return np.clip(base + delta, *BOUNDS)
+
+
+def design_matrix(draws: pd.DataFrame):
+    """Right-hand side of FORMULA; shared by every outcome fitted on `draws`."""
+    rhs = FORMULA.split("~", 1)[1]
+    return patsy.dmatrix(rhs, draws, return_type="dataframe")
+
+
+def fit_flags(y, X, alpha: float):
+    try:
+        fit = sm.OLS(y, X).fit(cov_type="HC1")
+        return dict(**key_term_flags(fit, alpha), converged=1)
+    except Exception:
+        return dict(**{col: np.nan for col in KEY_TERMS}, converged=0)
+
+
+def compare_cells(rep_df: pd.DataFrame, a: tuple, b: tuple, n_fits: int):
+    """Paired power differences between cells a and b (design, scenario)."""
+    cell_a = rep_df.xs(a, level=["design", "scenario"])
+    cell_b = rep_df.xs(b, level=["design", "scenario"])
+
+    out = []
+    for col in KEY_TERMS:
+        paired = pd.concat([cell_a[col], cell_b[col]], axis=1, keys=["a", "b"]).dropna()
+        n_rep = len(paired)
+        if n_rep < 2:
+            continue
+        d = paired["b"] - paired["a"]
+        p_a = paired["a"].mean()
+        p_b = paired["b"].mean()
+
+        var_paired = d.var(ddof=1) / n_rep
+        # Same number of fits per cell, but every fit with fresh noise
+        var_indep = (p_a * (1 - p_a) + p_b * (1 - p_b)) / n_fits
+        reduction = var_indep / var_paired if var_paired > 0 else np.nan
+
+        out.append(
+            dict(
+                term=col,
+                power_a=p_a,
+                power_b=p_b,
+                diff=p_b - p_a,
+                se_diff=np.sqrt(var_paired),
+                se_diff_independent=np.sqrt(var_indep),
+                variance_reduction=reduction,
+            )
+        )
+    return out
+
+
+def run_power_comparison(
+    designs=None,
+    effect_scenarios=None,
+    n_sims: int = 200,
+    alpha: float = 0.05,
+    common_random_numbers: bool = True,
+    antithetic: bool = True,
+):
+    if designs is None:
+        designs = DESIGNS
+    if effect_scenarios is None:
+        effect_scenarios = EFFECT_SCENARIOS
+
+    os.makedirs("data/synthetic", exist_ok=True)
+    os.makedirs("fig", exist_ok=True)
+
+    noise_signs = [1.0, -1.0] if antithetic else [1.0]
+    envelope = dict(
+        n_teams=max(d["n_teams"] for d in designs),
+        n_meetings_per_team=max(d["n_meetings_per_team"] for d in designs),
+        n_items_per_meeting=max(d["n_items_per_meeting"] for d in designs),
+    )
+
+    results = []
+
+    for rep in range(1, n_sims + 1):
+        if common_random_numbers:
+            shared = draw_common_numbers(rep, **envelope)
+
+        for d_idx, design in enumerate(designs):
+            if common_random_numbers:
+                draws = restrict_to_design(shared, design)
+                X = design_matrix(draws)
+
+            for s_idx, (scenario, effects) in enumerate(effect_scenarios.items()):
+                if not common_random_numbers:
+                    # Independent stream per (replicate, design, scenario)
+                    draws = draw_common_numbers([rep, d_idx, s_idx], **design)
+                    X = design_matrix(draws)
+
+                for arm, sign in enumerate(noise_signs):
+                    y = outcome_from_common_numbers(draws, effects, sign)
+                    results.append(
+                        dict(
+                            rep=rep,
+                            arm=arm,
+                            design=design_label(design),
+                            scenario=scenario,
+                            **design,
+                            alpha=alpha,
+                            **fit_flags(y, X, alpha),
+                        )
+                    )
+
+    df_res = pd.DataFrame(results)
+    out_path = "data/synthetic/power_comparison_results_study1.csv"
+    df_res.to_csv(out_path, index=False)
+
+    # One value per replicate and cell: the mean over antithetic arms
+    df_conv = df_res[df_res["converged"] == 1]
+    rep_df = df_conv.groupby(["design", "scenario", "rep"])[list(KEY_TERMS)].mean()
+
+    labels = [design_label(d) for d in designs]
+    scenarios = list(effect_scenarios)
+    comparisons = [
+        ((labels[0], s), (lab, s)) for s in scenarios for lab in labels[1:]
+    ] + [
+        ((lab, scenarios[0]), (lab, s)) for lab in labels for s in scenarios[1:]
+    ]
+
+    n_fits = n_sims * len(noise_signs)
+    rows = []
+    for a, b in comparisons:
+        for r in compare_cells(rep_df, a, b, n_fits):
+            rows.append(
+                dict(
+                    design_a=a[0],
+                    scenario_a=a[1],
+                    design_b=b[0],
+                    scenario_b=b[1],
+                    **r,
+                )
+            )
+    comp_df = pd.DataFrame(rows)
+    comp_df.insert(0, "common_random_numbers", int(common_random_numbers))
+    comp_df.insert(1, "antithetic", int(antithetic))
+    comp_df.insert(2, "n_sims", n_sims)
+    comp_df.to_csv("fig/power_comparison_study1.csv", index=False)
+
+    # Human-readable summary, focused on the interaction term
+    key = "sig_HumanFirst_Acc"
+    cell_power = rep_df[key].groupby(level=["design", "scenario"]).mean()
+    lines = [
+        "Power comparison summary for Study 1",
+        "====================================",
+        f"n_sims (replicates): {n_sims}",
+        f"fits per cell: {n_fits}",
+        f"common_random_numbers: {common_random_numbers}",
+        f"antithetic: {antithetic}",
+        f"alpha: {alpha}",
+        "",
+        "Estimated power (Human_first x accountability interaction):",
+    ]
+    for (lab, scenario), p in cell_power.items():
+        lines.append(f"  {lab:<12} {scenario:<18} {p:.3f}")
+    lines += ["", "Power differences (b - a) for the interaction:"]
+    for _, r in comp_df[comp_df["term"] == key].iterrows():
+        lines.append(
+            f"  {r['design_a']}/{r['scenario_a']} -> {r['design_b']}/{r['scenario_b']}: "
+            f"{r['diff']:+.3f} (SE {r['se_diff']:.3f}; "
+            f"independent SE {r['se_diff_independent']:.3f}; "
+            f"variance reduction x{r['variance_reduction']:.1f})"
+        )
+    with open("fig/power_comparison_summary_study1.txt", "w") as f:
+        f.write("\n".join(lines))
+
+    print("\n".join(lines))
+    print(f"\nSaved detailed results to {out_path}")
+    print("Saved power differences to fig/power_comparison_study1.csv")
+    print("Saved text summary to fig/power_comparison_summary_study1.txt")
+
+
+if __name__ == "__main__":
+    run_power_comparison()
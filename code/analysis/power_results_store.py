@@ -0,0 +1,239 @@
+"""
+Persistent store for simulation-based power results.
+
+Each simulated dataset is fitted once and its key-term p-values are kept in a
+local SQLite database, keyed by:
+
+- design (n_teams, n_meetings_per_team, n_items_per_meeting)
+- outcome
+- effect-size vector (canonical JSON)
+- estimator version
+- seed
+
+Re-running a sweep only computes seeds that are not in the store yet, and
+power for any alpha is answered by a query over the stored p-values. Fits
+that raised an exception are stored with the exception type in `error` and
+are retried on the next run; fits that ran but did not converge (converged=0,
+no error) are final for that estimator version.
+
+Default location:
+- data/synthetic/power_simulations_study1.sqlite
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+
+DEFAULT_STORE_PATH = "data/synthetic/power_simulations_study1.sqlite"
+
+DESIGN_COLUMNS = ["n_teams", "n_meetings_per_team", "n_items_per_meeting"]
+
+
+def effects_key(effects: dict) -> str:
+    """Canonical string for an effect-size vector (stable key order)."""
+    return json.dumps({k: float(v) for k, v in effects.items()}, sort_keys=True)
+
+
+class PowerResultsStore:
+    """SQLite-backed memo of per-seed power simulation results.
+
+    p_columns are the names of the stored p-value columns (one per tracked
+    coefficient). Columns missing from an existing database are added on
+    open, so callers tracking different terms can share one store.
+    """
+
+    def __init__(self, p_columns, path: str = DEFAULT_STORE_PATH):
+        self.p_columns = list(p_columns)
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self._create()
+
+    def _create(self):
+        p_cols = ", ".join(f"{c} REAL" for c in self.p_columns)
+        self.conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS sims (
+                n_teams INTEGER NOT NULL,
+                n_meetings_per_team INTEGER NOT NULL,
+                n_items_per_meeting INTEGER NOT NULL,
+                outcome TEXT NOT NULL,
+                effects TEXT NOT NULL,
+                estimator_version TEXT NOT NULL,
+                seed INTEGER NOT NULL,
+                converged INTEGER NOT NULL,
+                {p_cols},
+                error TEXT,
+                created_at TEXT,
+                PRIMARY KEY (n_teams, n_meetings_per_team, n_items_per_meeting,
+                             outcome, effects, estimator_version, seed)
+            )
+            """
+        )
+        # An existing store may have been created with other p-value columns
+        # (KEY_TERMS changed, or another caller); add the ones this caller
+        # needs. Rows stored before have NULL there.
+        existing = {row[1] for row in self.conn.execute("PRAGMA table_info(sims)")}
+        for c in self.p_columns:
+            if c not in existing:
+                self.conn.execute(f"ALTER TABLE sims ADD COLUMN {c} REAL")
+        self.conn.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS wanted_seeds (seed INTEGER PRIMARY KEY)"
+        )
+        self.conn.commit()
+
+    def _set_seeds(self, seeds):
+        """Load `seeds` into the temp table that queries join against."""
+        self.conn.execute("DELETE FROM wanted_seeds")
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO wanted_seeds (seed) VALUES (?)",
+            [(int(s),) for s in seeds],
+        )
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _power_columns(self, converged_only: bool, alias):
+        """AVG expressions giving the rejection rate of each p-value column.
+
+        Over all stored sims by default, with non-converged fits and terms
+        without a p-value counted as non-rejections; with converged_only,
+        over the converged sims in which the term has a p-value.
+        """
+        if converged_only:
+            # NULL p-values (non-converged or missing terms) drop out of AVG
+            expr = "AVG(CASE WHEN converged = 1 AND {c} IS NOT NULL THEN ({c} < ?) END)"
+        else:
+            expr = "AVG(CASE WHEN converged = 1 AND {c} < ? THEN 1.0 ELSE 0.0 END)"
+        return ", ".join(
+            f"{expr.format(c=c)} AS {alias(c)}" for c in self.p_columns
+        )
+
+    @staticmethod
+    def _where(design: dict, outcome: str, effects: dict, estimator_version: str):
+        clause = (
+            "n_teams = ? AND n_meetings_per_team = ? AND n_items_per_meeting = ? "
+            "AND outcome = ? AND effects = ? AND estimator_version = ?"
+        )
+        params = [design[c] for c in DESIGN_COLUMNS] + [
+            outcome,
+            effects_key(effects),
+            estimator_version,
+        ]
+        return clause, params
+
+    def stored_seeds(self, design, outcome, effects, estimator_version, seeds):
+        """Subset of `seeds` already in the store for this configuration.
+
+        Fits stored with an error are left out, so callers refit them.
+        """
+        clause, params = self._where(design, outcome, effects, estimator_version)
+        self._set_seeds(seeds)
+        rows = self.conn.execute(
+            f"SELECT seed FROM sims JOIN wanted_seeds USING (seed) "
+            f"WHERE {clause} AND error IS NULL",
+            params,
+        ).fetchall()
+        return {s for (s,) in rows}
+
+    def add(self, design, outcome, effects, estimator_version, results):
+        """Insert per-seed results: dicts with seed, converged, p_columns and
+        optionally error (exception type of a failed fit)."""
+        key = [design[c] for c in DESIGN_COLUMNS] + [
+            outcome,
+            effects_key(effects),
+            estimator_version,
+        ]
+        now = datetime.utcnow().isoformat()
+        cols = DESIGN_COLUMNS + [
+            "outcome",
+            "effects",
+            "estimator_version",
+            "seed",
+            "converged",
+            *self.p_columns,
+            "error",
+            "created_at",
+        ]
+        rows = [
+            key
+            + [r["seed"], r["converged"]]
+            + [r.get(c) for c in self.p_columns]
+            + [r.get("error"), now]
+            for r in results
+        ]
+        self.conn.executemany(
+            f"INSERT OR REPLACE INTO sims ({', '.join(cols)}) "
+            f"VALUES ({', '.join('?' for _ in cols)})",
+            rows,
+        )
+        self.conn.commit()
+
+    def results(self, design, outcome, effects, estimator_version, seeds):
+        """Stored per-seed rows for this configuration, ordered by seed."""
+        clause, params = self._where(design, outcome, effects, estimator_version)
+        self._set_seeds(seeds)
+        return pd.read_sql_query(
+            f"SELECT seed, converged, {', '.join(self.p_columns)}, error "
+            f"FROM sims JOIN wanted_seeds USING (seed) "
+            f"WHERE {clause} ORDER BY seed",
+            self.conn,
+            params=params,
+        )
+
+    def power(
+        self,
+        design,
+        outcome,
+        effects,
+        estimator_version,
+        alpha,
+        seeds,
+        converged_only: bool = False,
+    ):
+        """Power per p-value column, as a single-row dict, from stored sims.
+
+        See _power_columns() for the denominator.
+        """
+        clause, params = self._where(design, outcome, effects, estimator_version)
+        self._set_seeds(seeds)
+        power_cols = self._power_columns(converged_only, lambda c: c)
+        row = self.conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(converged), 0), {power_cols} "
+            f"FROM sims JOIN wanted_seeds USING (seed) WHERE {clause}",
+            [alpha] * len(self.p_columns) + params,
+        ).fetchone()
+        out = dict(n_sims=row[0], n_converged=row[1])
+        for c, v in zip(self.p_columns, row[2:]):
+            out[c] = float("nan") if v is None else v
+        return out
+
+    def power_table(self, alpha: float, converged_only: bool = False):
+        """Power at `alpha` for every stored configuration, one row each.
+
+        Uses the same denominator as power(). Reflects whatever the local
+        store holds, so it is a working view of the cache rather than a
+        reproducible artifact.
+        """
+        power_cols = self._power_columns(
+            converged_only,
+            lambda c: f"power_{c[2:] if c.startswith('p_') else c}",
+        )
+        group = DESIGN_COLUMNS + ["outcome", "effects", "estimator_version"]
+        return pd.read_sql_query(
+            f"SELECT {', '.join(group)}, ? AS alpha, COUNT(*) AS n_sims, "
+            f"SUM(converged) AS n_converged, {power_cols} "
+            f"FROM sims GROUP BY {', '.join(group)} ORDER BY {', '.join(group)}",
+            self.conn,
+            params=[alpha] * (len(self.p_columns) + 1),
+        )
@@ -0,0 +1,459 @@
+"""
+Simulation-based power analysis for Study 1 secondary outcomes.
+
+Extends power_simulation_study1.py to the two secondary outcomes whose
+data-generating rules are encoded in generate_synthetic_agenda_data.py:
+
+- override_ai (0/1): logit model
+- junior_critical_turns (count): Poisson model
+
+Both use the same right-hand side as the primary model (sequencing dummies,
+accountability, their interactions and team fixed effects) with robust (HC1)
+sandwich standard errors.
+
+Each simulated dataset is the primary simulate_dataset() draw for that seed,
+with the secondary outcomes drawn from a separate random stream, so the
+primary results for a seed are unchanged.
+
+The GLMs are fitted with a lean IRLS routine (step-halving, HC1 sandwich
+computed directly) on a pre-built numpy design matrix rather than through a
+formula and a full statsmodels results object; that alone keeps a GLM sweep
+at about the cost of the OLS sweep. Teams with no outcome variation are
+dropped before fitting: they only pin their own fixed effect at +/- infinity.
+Fits are memoized in the same results store as the primary outcome.
+
+When a fit separates (e.g. a condition x accountability cell with no
+overrides), the rows it predicts perfectly carry no information about the
+other coefficients, so they are dropped and the model is refitted, as Stata's
+logit does. Only the terms whose own coefficient diverges are left without a
+p-value. The headline rejection rates are over all sims, with such terms
+counted as non-rejections; rates over sims where the term was estimated are
+reported alongside, but they condition on the data and are not power.
+
+Outputs:
+- data/synthetic/power_simulation_results_secondary_study1.csv
+- fig/power_curve_secondary_study1.csv
+- fig/power_simulation_summary_secondary_study1.txt
+- fig/power_store_summary_study1.csv (power for every configuration in the
+  local store; not committed)
+"""
+
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from power_results_store import DEFAULT_STORE_PATH, PowerResultsStore
+from power_simulation_study1 import (
+    DEFAULT_EFFECTS,
+    ESTIMATOR_VERSION,
+    KEY_TERMS,
+    P_COLUMNS,
+    simulate_dataset,
+)
+
+
+# Secondary-outcome rules, as in generate_synthetic_agenda_data.py
+DEFAULT_SECONDARY_EFFECTS = dict(
+    override_base=0.10,
+    override_human_first=0.08,
+    override_accountability=0.07,
+    override_high_talk=0.05,        # junior_talk_share > 0.3
+    crit_turns_per_talk_share=10.0,  # expected critical turns = 10 * share
+    crit_turns_sd=1.0,
+)
+
+# Outcome -> GLM family
+SECONDARY_OUTCOMES = {
+    "override_ai": "logit",
+    "junior_critical_turns": "poisson",
+}
+
+# Bump whenever the secondary data-generating rules, design matrix or
+# IRLS / standard-error computation changes. Stored fits are keyed by these
+# combined with the primary ESTIMATOR_VERSION (see estimator_version()).
+ESTIMATOR_VERSIONS = {
+    "logit": "logit_irls_hc1_v2",
+    "poisson": "poisson_irls_hc1_v2",
+}
+
+# Tracked terms with a direct effect on each outcome under the rules above.
+# override_ai depends on AI_first and the interaction only through
+# junior_talk_share > 0.3, so their rejection rates are close to test size.
+DIRECT_EFFECT_TERMS = {
+    "override_ai": {"sig_Human_first"},
+    "junior_critical_turns": set(KEY_TERMS),
+}
+
+# |coefficient| (and |linear predictor|) beyond which a fit is treated as
+# diverging (separation, e.g. a condition x accountability cell with no
+# overrides)
+SEPARATION_BOUND = 15.0
+
+# Refits after dropping perfectly predicted rows before giving up on a sim
+MAX_SEPARATION_ROUNDS = 3
+
+# Treatment columns of the design matrix, in order, after the team dummies
+TREATMENT_TERMS = [
+    "AI_first",
+    "Human_first",
+    "accountability",
+    "AI_first:accountability",
+    "Human_first:accountability",
+]
+
+
+def estimator_version(family: str) -> str:
+    return f"{ESTIMATOR_VERSIONS[family]}+{ESTIMATOR_VERSION}"
+
+
+def add_secondary_outcomes(df: pd.DataFrame, seed: int, secondary_effects: dict):
+    rng = np.random.default_rng([seed, 1])
+    talk = df["junior_talk_share"].to_numpy()
+
+    override_prob = (
+        secondary_effects["override_base"]
+        + secondary_effects["override_human_first"] * df["Human_first"].to_numpy()
+        + secondary_effects["override_accountability"] * df["accountability"].to_numpy()
+        + secondary_effects["override_high_talk"] * (talk > 0.3)
+    )
+    override_prob = np.clip(override_prob, 0.02, 0.6)
+
+    expected_crit = secondary_effects["crit_turns_per_talk_share"] * talk
+    crit = np.rint(rng.normal(expected_crit, secondary_effects["crit_turns_sd"]))
+
+    df = df.copy()
+    df["override_ai"] = (rng.random(len(df)) < override_prob).astype(int)
+    df["junior_critical_turns"] = np.maximum(crit, 0).astype(int)
+    return df
+
+
+def team_index(df: pd.DataFrame):
+    """0-based team number from team_id (T1 -> 0)."""
+    return df["team_id"].str[1:].astype(int).to_numpy() - 1
+
+
+def design_matrix(df: pd.DataFrame, n_teams: int):
+    """One dummy per team (no intercept), then TREATMENT_TERMS."""
+    team_idx = team_index(df)
+    team_fe = np.eye(n_teams)[team_idx]
+    ai = df["AI_first"].to_numpy(dtype=float)
+    hf = df["Human_first"].to_numpy(dtype=float)
+    acc = df["accountability"].to_numpy(dtype=float)
+    return np.column_stack(
+        [team_fe, ai, hf, acc, ai * acc, hf * acc]
+    )
+
+
+def _mean(family: str, eta):
+    if family == "logit":
+        return 0.5 * (1.0 + np.tanh(0.5 * eta))
+    return np.exp(eta)
+
+
+def _cold_start(family: str, X, y):
+    """Team effects at the link of the overall mean, treatment terms at 0."""
+    beta = np.zeros(X.shape[1])
+    ybar = np.clip(y.mean(), 1e-3, 1 - 1e-3) if family == "logit" else max(y.mean(), 1e-3)
+    link = math.log(ybar / (1 - ybar)) if family == "logit" else math.log(ybar)
+    beta[: X.shape[1] - len(TREATMENT_TERMS)] = link
+    return beta
+
+
+def _deviance(family: str, y, eta):
+    """Deviance up to a constant (twice the negative log-likelihood kernel)."""
+    if family == "logit":
+        return 2.0 * np.sum(np.logaddexp(0.0, eta) - y * eta)
+    return 2.0 * np.sum(np.exp(eta) - y * eta)
+
+
+def irls(family: str, X, y, beta0=None, max_iter: int = 50, tol: float = 1e-8):
+    """Canonical-link IRLS for logit / Poisson with step-halving.
+
+    A Newton step that increases the deviance is halved (as in R's glm), so
+    the iteration cannot overshoot from a poor start. Returns
+    (beta, XtWX, mu, n_iter, converged). Under separation the iteration runs
+    to max_iter with the diverging coefficients well past SEPARATION_BOUND;
+    such fits are reported as converged=False.
+    """
+    beta = _cold_start(family, X, y) if beta0 is None else beta0.copy()
+    eta = X @ beta
+    dev = _deviance(family, y, eta)
+    for n_iter in range(1, max_iter + 1):
+        mu = _mean(family, eta)
+        w = mu * (1 - mu) if family == "logit" else mu
+        w = np.maximum(w, 1e-10)
+        z = eta + (y - mu) / w
+        XtW = X.T * w
+        XtWX = XtW @ X
+        step = np.linalg.solve(XtWX, XtW @ z) - beta
+
+        for _ in range(10):
+            beta_new = beta + step
+            eta_new = X @ beta_new
+            dev_new = _deviance(family, y, eta_new)
+            if dev_new <= dev + 1e-10 * (1 + abs(dev)):
+                break
+            step = step / 2.0
+
+        beta, eta, dev = beta_new, eta_new, dev_new
+        if np.max(np.abs(step)) < tol * (1 + np.max(np.abs(beta))):
+            mu = _mean(family, eta)
+            w = mu * (1 - mu) if family == "logit" else mu
+            converged = bool(np.all(np.abs(beta) < SEPARATION_BOUND))
+            return beta, (X.T * w) @ X, mu, n_iter, converged
+    return beta, XtWX, mu, max_iter, False
+
+
+def robust_pvalues(X, y, beta, XtWX, mu, terms):
+    """Two-sided z-test p-values with HC1 sandwich SEs for `terms`, the names
+    of the last len(terms) columns of X."""
+    n, k = X.shape
+    bread = np.linalg.inv(XtWX)
+    scores = X * (y - mu)[:, None]
+    cov = bread @ (scores.T @ scores) @ bread * n / (n - k)
+    idx = np.arange(k - len(terms), k)
+    z = beta[idx] / np.sqrt(np.diag(cov)[idx])
+    return {
+        term: math.erfc(abs(zi) / math.sqrt(2.0))
+        for term, zi in zip(terms, z)
+    }
+
+
+def informative_rows(family: str, team_idx, y):
+    """Rows of teams whose outcome varies (logit) or is not all zero (Poisson).
+
+    Other teams only pin their own fixed effect at +/- infinity and carry no
+    information about the treatment terms, so they are dropped before fitting.
+    """
+    keep = np.ones(len(y), dtype=bool)
+    for t in np.unique(team_idx):
+        yt = y[team_idx == t]
+        if yt.max() == 0 or (family == "logit" and yt.min() == 1):
+            keep[team_idx == t] = False
+    return keep
+
+
+def independent_columns(X):
+    """Mask of columns that are not all zero or linearly dependent on earlier
+    columns."""
+    keep = np.zeros(X.shape[1], dtype=bool)
+    rank = 0
+    for j in range(X.shape[1]):
+        keep[j] = True
+        r = np.linalg.matrix_rank(X[:, keep])
+        if r > rank:
+            rank = r
+        else:
+            keep[j] = False
+    return keep
+
+
+def fit_glm(family: str, X, y, team_idx):
+    """HC1 p-values for TREATMENT_TERMS, or None if the fit fails.
+
+    If the fit separates, the rows it predicts perfectly (|linear predictor|
+    past SEPARATION_BOUND) are dropped and the model is refitted: at the
+    limit those rows contribute nothing to the likelihood, so the remaining
+    coefficients are unchanged. Terms whose own coefficient diverged, or that
+    are no longer identified, get p-value None.
+    """
+    rows = informative_rows(family, team_idx, y)
+    Xf, yf = X[rows], y[rows]
+    n_fe = X.shape[1] - len(TREATMENT_TERMS)
+    diverged = np.zeros(X.shape[1], dtype=bool)
+    try:
+        for _ in range(MAX_SEPARATION_ROUNDS):
+            cols = independent_columns(Xf)
+            if Xf.shape[0] <= cols.sum():
+                return None
+            beta, XtWX, mu, n_iter, ok = irls(family, Xf[:, cols], yf)
+            if ok:
+                break
+            big = np.abs(beta) >= SEPARATION_BOUND
+            if not big.any():
+                return None
+            diverged[np.flatnonzero(cols)[big]] = True
+            predicted = np.abs(Xf[:, cols] @ beta) >= SEPARATION_BOUND
+            Xf, yf = Xf[~predicted], yf[~predicted]
+        else:
+            return None
+        kept = [t for t, c in zip(TREATMENT_TERMS, cols[n_fe:]) if c]
+        pvalues = robust_pvalues(Xf[:, cols], yf, beta, XtWX, mu, kept)
+    except np.linalg.LinAlgError:
+        return None
+    return {
+        term: None if diverged[n_fe + j] else pvalues.get(term)
+        for j, term in enumerate(TREATMENT_TERMS)
+    }
+
+
+def run_secondary_power_simulation(
+    n_sims: int = 300,
+    n_teams: int = 6,
+    n_meetings_per_team: int = 4,
+    n_items_per_meeting: int = 5,
+    alpha: float = 0.05,
+    effects: dict = None,
+    secondary_effects: dict = None,
+    store_path: str = DEFAULT_STORE_PATH,
+):
+    if effects is None:
+        effects = DEFAULT_EFFECTS
+    if secondary_effects is None:
+        secondary_effects = DEFAULT_SECONDARY_EFFECTS
+
+    os.makedirs("data/synthetic", exist_ok=True)
+    os.makedirs("fig", exist_ok=True)
+
+    design = dict(
+        n_teams=n_teams,
+        n_meetings_per_team=n_meetings_per_team,
+        n_items_per_meeting=n_items_per_meeting,
+    )
+    # The effect-size vector a stored fit depends on covers both sets
+    all_effects = dict(effects, **secondary_effects)
+    seeds = range(1, n_sims + 1)
+    p_col = {term: P_COLUMNS[col] for col, term in KEY_TERMS.items()}
+
+    rows = []
+    summaries = []
+    with PowerResultsStore(P_COLUMNS.values(), store_path) as store:
+        todo = {}
+        for outcome, family in SECONDARY_OUTCOMES.items():
+            key = (design, outcome, all_effects, estimator_version(family))
+            stored = store.stored_seeds(*key, seeds)
+            todo[outcome] = {s for s in seeds if s not in stored}
+
+        new = {outcome: [] for outcome in SECONDARY_OUTCOMES}
+        for sim_id in sorted(set().union(*todo.values())):
+            df = simulate_dataset(**design, seed=sim_id, effects=effects)
+            df = add_secondary_outcomes(df, sim_id, secondary_effects)
+            X = design_matrix(df, n_teams)
+            team_idx = team_index(df)
+
+            for outcome, family in SECONDARY_OUTCOMES.items():
+                if sim_id not in todo[outcome]:
+                    continue
+                pvalues = fit_glm(
+                    family, X, df[outcome].to_numpy(dtype=float), team_idx
+                )
+                if pvalues is None:
+                    new[outcome].append(dict(seed=sim_id, converged=0))
+                else:
+                    new[outcome].append(
+                        dict(
+                            seed=sim_id,
+                            converged=1,
+                            **{
+                                p_col[t]: p
+                                for t, p in pvalues.items()
+                                if t in p_col and p is not None
+                            },
+                        )
+                    )
+
+        for outcome, family in SECONDARY_OUTCOMES.items():
+            key = (design, outcome, all_effects, estimator_version(family))
+            if new[outcome]:
+                store.add(*key, new[outcome])
+
+            df_store = store.results(*key, seeds)
+            power = store.power(*key, alpha, seeds)
+            power_converged = store.power(*key, alpha, seeds, converged_only=True)
+            print(
+                f"{outcome}: reused {n_sims - len(todo[outcome])} stored sims; "
+                f"computed {len(todo[outcome])} new sims."
+            )
+
+            df_out = pd.DataFrame(
+                dict(
+                    sim_id=df_store["seed"],
+                    outcome=outcome,
+                    model=family,
+                    **design,
+                    alpha=alpha,
+                )
+            )
+            for col, pc in P_COLUMNS.items():
+                p = df_store[pc]
+                df_out[col] = (p < alpha).astype(int).where(p.notna())
+            df_out["converged"] = df_store["converged"]
+            rows.append(df_out)
+
+            summary = dict(
+                outcome=outcome,
+                model=family,
+                n_sims=power["n_sims"],
+                n_converged=power["n_converged"],
+            )
+            for col, pc in P_COLUMNS.items():
+                term = col[len("sig_"):]
+                summary[f"power_{term}"] = power[pc]
+                summary[f"power_converged_{term}"] = power_converged[pc]
+                summary[f"n_estimated_{term}"] = int(df_store[pc].notna().sum())
+            summaries.append(dict(summary, alpha=alpha, **design))
+
+        store.power_table(alpha).to_csv("fig/power_store_summary_study1.csv", index=False)
+
+    out_path = "data/synthetic/power_simulation_results_secondary_study1.csv"
+    pd.concat(rows, ignore_index=True).to_csv(out_path, index=False)
+    pd.DataFrame(summaries).to_csv("fig/power_curve_secondary_study1.csv", index=False)
+
+    lines = [
+        "Power simulation summary for Study 1 secondary outcomes",
+        "=======================================================",
+        f"alpha: {alpha}",
+        f"n_teams: {n_teams}",
+        f"n_meetings_per_team: {n_meetings_per_team}",
+        f"n_items_per_meeting: {n_items_per_meeting}",
+    ]
+    labels = {
+        "AI_first": "AI_first main effect",
+        "Human_first": "Human_first main effect",
+        "HumanFirst_Acc": "Human_first x accountability interaction",
+    }
+    for s in summaries:
+        n_failed = s["n_sims"] - s["n_converged"]
+        lines += [
+            "",
+            f"{s['outcome']} ({s['model']}, HC1 SEs)",
+            f"  n_sims: {s['n_sims']}",
+            f"  n_converged: {s['n_converged']}"
+            + (f" ({n_failed} failed; counted as non-rejections)" if n_failed else ""),
+            "  Rejection rate over all sims (over sims where the term was estimated):",
+        ]
+        for col in KEY_TERMS:
+            term = col[len("sig_"):]
+            rate = s[f"power_{term}"]
+            n_est = s[f"n_estimated_{term}"]
+            line = (
+                f"    {labels[term]}: {rate:.3f} "
+                f"({s[f'power_converged_{term}']:.3f}, n={n_est})"
+            )
+            if col in DIRECT_EFFECT_TERMS[s["outcome"]]:
+                line += "  [power" + ("; below alpha" if rate < alpha else "") + "]"
+            else:
+                line += "  [no direct effect: test size, not power"
+                if rate < alpha / 2:
+                    line += "; test is undersized"
+                line += "]"
+            lines.append(line)
+        lines.append(
+            "  Terms not estimated (their own coefficient diverged under "
+            "separation) count as non-rejections."
+        )
+
+    with open("fig/power_simulation_summary_secondary_study1.txt", "w") as f:
+        f.write("\n".join(lines))
+
+    print("\n".join(lines))
+    print(f"\nSaved detailed results to {out_path}")
+    print("Saved aggregate power to fig/power_curve_secondary_study1.csv")
+    print("Saved text summary to fig/power_simulation_summary_secondary_study1.txt")
+    print("Saved store-wide power table to fig/power_store_summary_study1.csv")
+
+
+if __name__ == "__main__":
+    run_secondary_power_simulation()
@@ -12,10 +12,18 @@ For each simulated dataset, we fit the same regression model as in
 main_regression_synthetic.py and record whether key coefficients are
 significant at alpha = 0.05.
 
+Each simulated fit is memoized in a local SQLite store (see
+power_results_store.py), keyed by design, effect sizes, estimator version
+and seed, so re-running the same or an overlapping sweep only fits the
+seeds that are new. Power is computed by querying the store.
+
 Outputs:
+- data/synthetic/power_simulations_study1.sqlite (results store)
 - data/synthetic/power_simulation_results_study1.csv
 - fig/power_curve_study1.csv
 - fig/power_simulation_summary_study1.txt
+- fig/power_store_summary_study1.csv (power for every configuration in the
+  local store; not committed)
 """
 
 import csv
@@ -26,6 +34,46 @@ import numpy as np
 import pandas as pd
 import statsmodels.formula.api as smf
 
+from power_results_store import DEFAULT_STORE_PATH, PowerResultsStore
+
+
+CONDITIONS = ["AI_FIRST", "HUMAN_FIRST", "STATUS_QUO"]
+
+# Baseline junior talk share ~ Normal(BASE_MEAN, BASE_SD), clamped to BOUNDS
+BASE_MEAN = 0.22
+BASE_SD = 0.05
+BOUNDS = (0.05, 0.80)
+
+# True effect sizes (assumptions for power), on the junior_talk_share scale
+DEFAULT_EFFECTS = dict(
+    ai_first=-0.02,           # slight negative main effect
+    human_first=0.05,         # main effect of HUMAN_FIRST
+    accountability=0.04,      # main effect of accountability
+    human_first_x_acc=0.05,   # interaction (our key effect)
+)
+
+FORMULA = (
+    "junior_talk_share ~ AI_first + Human_first + accountability "
+    "+ AI_first:accountability + Human_first:accountability "
+    "+ C(team_id)"
+)
+
+# Coefficients whose significance we track, keyed by results column
+KEY_TERMS = {
+    "sig_AI_first": "AI_first",
+    "sig_Human_first": "Human_first",
+    "sig_HumanFirst_Acc": "Human_first:accountability",
+}
+
+# Stored p-value column for each significance column above
+P_COLUMNS = {col: "p_" + col[len("sig_"):] for col in KEY_TERMS}
+
+OUTCOME = "junior_talk_share"
+
+# Bump whenever simulate_dataset(), FORMULA or the fitting procedure changes,
+# so that stored results from the old version are not reused.
+ESTIMATOR_VERSION = "ols_hc1_v1"
+
 
 def clamp(x, lo, hi):
     return max(lo, min(hi, x))
@@ -36,13 +84,15 @@ def simulate_dataset(
     n_meetings_per_team: int,
     n_items_per_meeting: int,
     seed: int,
+    effects: dict = None,
 ):
+    if effects is None:
+        effects = DEFAULT_EFFECTS
+
     random.seed(seed)
     np.random.seed(seed)
 
     teams = [f"T{i}" for i in range(1, n_teams + 1)]
-    conditions = ["AI_FIRST", "HUMAN_FIRST", "STATUS_QUO"]
-
     rows = []
 
     for t in teams:
@@ -53,24 +103,22 @@ def simulate_dataset(
             for a in range(1, n_items_per_meeting + 1):
                 agenda_item_id = f"{meeting_id}_A{a}"
 
-                seq_cond = random.choice(conditions)
+                seq_cond = random.choice(CONDITIONS)
                 accountability = random.choice([0, 1])
 
-                # Base junior talk share around 0.22
-                base = np.random.normal(0.22, 0.05)
+                base = np.random.normal(BASE_MEAN, BASE_SD)
 
-                # True effect sizes (assumptions for power)
                 delta = 0.0
                 if seq_cond == "HUMAN_FIRST":
-                    delta += 0.05        # main effect of HUMAN_FIRST
+                    delta += effects["human_first"]
                 if seq_cond == "AI_FIRST":
-                    delta -= 0.02        # slight negative main effect
+                    delta += effects["ai_first"]
                 if accountability == 1:
-                    delta += 0.04        # main effect of accountability
+                    delta += effects["accountability"]
                 if seq_cond == "HUMAN_FIRST" and accountability == 1:
-                    delta += 0.05        # interaction (our key effect)
+                    delta += effects["human_first_x_acc"]
 
-                junior_talk_share = clamp(base + delta, 0.05, 0.80)
+                junior_talk_share = clamp(base + delta, *BOUNDS)
 
                 rows.append(
                     dict(
@@ -90,87 +138,105 @@ def simulate_dataset(
     return df
 
 
+def key_term_pvalues(fit):
+    """Return p-values for KEY_TERMS (NaN if a term is not in the model)."""
+    pvalues = fit.pvalues
+    return {
+        col: float(pvalues[term]) if term in pvalues.index else np.nan
+        for col, term in KEY_TERMS.items()
+    }
+
+
+def key_term_flags(fit, alpha: float):
+    """Return 1/0 significance flags for KEY_TERMS from a fitted OLS model."""
+    return {
+        col: np.nan if np.isnan(p) else int(p < alpha)
+        for col, p in key_term_pvalues(fit).items()
+    }
+
+
+def simulate_and_fit(design: dict, effects: dict, seed: int):
+    """Simulate one dataset and return its store row (seed, converged, p-values)."""
+    df = simulate_dataset(**design, seed=seed, effects=effects)
+    try:
+        fit = smf.ols(formula=FORMULA, data=df).fit(cov_type="HC1")
+        pvalues = key_term_pvalues(fit)
+        return dict(
+            seed=seed,
+            converged=1,
+            **{P_COLUMNS[col]: p for col, p in pvalues.items()},
+        )
+    except Exception as e:
+        # Stored with its error so that the next run retries this seed
+        return dict(seed=seed, converged=0, error=type(e).__name__)
+
+
 def run_power_simulation(
     n_sims: int = 300,
     n_teams: int = 6,
     n_meetings_per_team: int = 4,
     n_items_per_meeting: int = 5,
     alpha: float = 0.05,
+    effects: dict = None,
+    store_path: str = DEFAULT_STORE_PATH,
 ):
+    if effects is None:
+        effects = DEFAULT_EFFECTS
+
     os.makedirs("data/synthetic", exist_ok=True)
     os.makedirs("fig", exist_ok=True)
 
-    results = []
-
-    for sim_id in range(1, n_sims + 1):
-        df = simulate_dataset(
+    design = dict(
+        n_teams=n_teams,
+        n_meetings_per_team=n_meetings_per_team,
+        n_items_per_meeting=n_items_per_meeting,
+    )
+    seeds = range(1, n_sims + 1)
+    key = (design, OUTCOME, effects, ESTIMATOR_VERSION)
+
+    with PowerResultsStore(P_COLUMNS.values(), store_path) as store:
+        stored = store.stored_seeds(*key, seeds)
+        todo = [s for s in seeds if s not in stored]
+
+        batch = []
+        for sim_id in todo:
+            batch.append(simulate_and_fit(design, effects, sim_id))
+            # Commit in chunks so an interrupted sweep keeps its progress
+            if len(batch) >= 50:
+                store.add(*key, batch)
+                batch = []
+        if batch:
+            store.add(*key, batch)
+
+        df_store = store.results(*key, seeds)
+        power = store.power(*key, alpha, seeds)
+        store.power_table(alpha).to_csv("fig/power_store_summary_study1.csv", index=False)
+
+    print(f"Reused {len(stored)} stored sims; computed {len(todo)} new sims.")
+
+    df_res = pd.DataFrame(
+        dict(
+            sim_id=df_store["seed"],
             n_teams=n_teams,
             n_meetings_per_team=n_meetings_per_team,
             n_items_per_meeting=n_items_per_meeting,
-            seed=sim_id,
-        )
-
-        formula = (
-            "junior_talk_share ~ AI_first + Human_first + accountability "
-            "+ AI_first:accountability + Human_first:accountability "
-            "+ C(team_id)"
+            alpha=alpha,
         )
-
-        try:
-            model = smf.ols(formula=formula, data=df)
-            fit = model.fit(cov_type="HC1")
-            coefs = fit.summary2().tables[1]
-
-            def is_sig(term):
-                if term not in coefs.index:
-                    return np.nan
-                pval = coefs.loc[term, "P>|t|"]
-                return 1 if pval < alpha else 0
-
-            sig_AI_first = is_sig("AI_first")
-            sig_Human_first = is_sig("Human_first")
-            sig_HF_Acc = is_sig("Human_first:accountability")
-
-            results.append(
-                dict(
-                    sim_id=sim_id,
-                    n_teams=n_teams,
-                    n_meetings_per_team=n_meetings_per_team,
-                    n_items_per_meeting=n_items_per_meeting,
-                    alpha=alpha,
-                    sig_AI_first=sig_AI_first,
-                    sig_Human_first=sig_Human_first,
-                    sig_HumanFirst_Acc=sig_HF_Acc,
-                    converged=1,
-                )
-            )
-        except Exception as e:
-            results.append(
-                dict(
-                    sim_id=sim_id,
-                    n_teams=n_teams,
-                    n_meetings_per_team=n_meetings_per_team,
-                    n_items_per_meeting=n_items_per_meeting,
-                    alpha=alpha,
-                    sig_AI_first=np.nan,
-                    sig_Human_first=np.nan,
-                    sig_HumanFirst_Acc=np.nan,
-                    converged=0,
-                )
-            )
-
-    df_res = pd.DataFrame(results)
+    )
+    for col, p_col in P_COLUMNS.items():
+        p = df_store[p_col]
+        df_res[col] = (p < alpha).astype(int).where(p.notna())
+    df_res["converged"] = df_store["converged"]
     out_path = "data/synthetic/power_simulation_results_study1.csv"
     df_res.to_csv(out_path, index=False)
 
     # Aggregate power (proportion significant among converged sims)
-    df_conv = df_res[df_res["converged"] == 1]
     summary = {
-        "n_sims": len(df_res),
-        "n_converged": len(df_conv),
-        "power_AI_first": df_conv["sig_AI_first"].mean(),
-        "power_Human_first": df_conv["sig_Human_first"].mean(),
-        "power_HumanFirst_Acc": df_conv["sig_HumanFirst_Acc"].mean(),
+        "n_sims": power["n_sims"],
+        "n_converged": power["n_converged"],
+        "power_AI_first": power["p_AI_first"],
+        "power_Human_first": power["p_Human_first"],
+        "power_HumanFirst_Acc": power["p_HumanFirst_Acc"],
         "alpha": alpha,
         "n_teams": n_teams,
         "n_meetings_per_team": n_meetings_per_team,
@@ -205,6 +271,7 @@ def run_power_simulation(
     print(f"\nSaved detailed results to {out_path}")
     print("Saved aggregate power curve to fig/power_curve_study1.csv")
     print("Saved text summary to fig/power_simulation_summary_study1.txt")
+    print("Saved store-wide power table to fig/power_store_summary_study1.csv")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,228 @@
+"""
+Randomization inference for the sequencing x accountability model.
+
+The study randomizes sequence_condition (AI_FIRST / HUMAN_FIRST / STATUS_QUO,
+each with probability 1/3) and accountability (0/1, probability 1/2)
+independently for every agenda item. With the outcome held fixed and only the
+assignment treated as random, we:
+
+1. Re-draw both assignments many times under that same scheme.
+2. Re-estimate the main regression model for each draw:
+
+     junior_talk_share ~ AI_first + Human_first + accountability
+                         + AI_first:accountability
+                         + Human_first:accountability
+                         + team fixed effects
+
+3. Compare each observed robust t-statistic (coefficient / HC1 SE) with its
+   randomization distribution.
+
+Re-drawing the assignment with the outcome fixed is exact only under the
+sharp null that nothing has any effect. The raw coefficient is a poor
+statistic for a single term: when other terms have effects, re-randomizing
+spreads their signal into the reference distribution. The studentized
+statistic stays asymptotically valid for the null that that one coefficient
+is zero, whatever the other terms do, and is exact under the sharp null.
+
+The team fixed effects do not depend on the assignment, so they are
+partialled out once (Frisch-Waugh-Lovell): the outcome is demeaned within
+team a single time, and each batch of re-drawn treatment columns is demeaned
+with the same team-mean operator and solved with batched 5x5 systems. The HC1
+sandwich is computed in the same batched form and matches the full dummy
+regression (residual degrees of freedom count the team effects).
+
+This script:
+- Reads data/synthetic/study1_agenda_items_synthetic_full.csv
+- Runs n_perms re-randomizations (default: 20000)
+- Saves:
+  - fig/randomization_inference_synthetic.csv (per-term estimates and p-values)
+  - fig/randomization_inference_synthetic.txt (human-readable summary)
+"""
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+
+TERMS = [
+    "AI_first",
+    "Human_first",
+    "accountability",
+    "AI_first:accountability",
+    "Human_first:accountability",
+]
+
+CONDITIONS = ["AI_FIRST", "HUMAN_FIRST", "STATUS_QUO"]
+
+
+def treatment_columns(cond_idx, acc):
+    """Stack the five treatment regressors, in TERMS order, on the last axis.
+
+    cond_idx indexes CONDITIONS; both arrays may carry leading batch axes.
+    """
+    ai = (cond_idx == 0).astype(float)
+    hf = (cond_idx == 1).astype(float)
+    acc = acc.astype(float)
+    return np.stack([ai, hf, acc, ai * acc, hf * acc], axis=-1)
+
+
+class WithinTeamOLS:
+    """OLS of a fixed outcome on treatment columns plus team fixed effects.
+
+    The team indicator part is factorized once; estimate() then handles a
+    batch of (n_draws, n_items, n_terms) treatment matrices at a time.
+    """
+
+    def __init__(self, y, team_codes):
+        self.team_codes = np.asarray(team_codes)
+        self.n_teams = self.team_codes.max() + 1
+        self.counts = np.bincount(self.team_codes, minlength=self.n_teams)
+        # One-hot team indicator, scaled so that D_mean.T @ x gives team means
+        self.D = np.eye(self.n_teams)[self.team_codes]
+        self.D_mean = self.D / self.counts
+        self.y_tilde = self.demean(np.asarray(y, dtype=float))
+
+    def demean(self, x):
+        """Subtract team means along the item axis (second-to-last for 3-D x)."""
+        if x.ndim == 1:
+            return x - self.D @ (self.D_mean.T @ x)
+        means = np.einsum("nt,bnk->btk", self.D_mean, x)
+        return x - np.einsum("nt,btk->bnk", self.D, means)
+
+    def estimate(self, X):
+        """Coefficients and HC1 standard errors, each (n_draws, n_terms).
+
+        Draws that leave some treatment cell empty give NaN.
+        """
+        X_tilde = self.demean(X)
+        XtX = np.einsum("bnk,bnl->bkl", X_tilde, X_tilde)
+        Xty = np.einsum("bnk,n->bk", X_tilde, self.y_tilde)
+
+        n_draws, n_items, n_terms = X.shape
+        beta = np.full((n_draws, n_terms), np.nan)
+        bread = np.full((n_draws, n_terms, n_terms), np.nan)
+        ok = np.linalg.matrix_rank(XtX) == n_terms
+        bread[ok] = np.linalg.inv(XtX[ok])
+        beta[ok] = np.einsum("bkl,bl->bk", bread[ok], Xty[ok])
+
+        resid = self.y_tilde - np.einsum("bnk,bk->bn", X_tilde, beta)
+        meat = np.einsum("bnk,bn,bnl->bkl", X_tilde, resid ** 2, X_tilde)
+        cov = np.einsum("bkl,blm,bmj->bkj", bread, meat, bread)
+        df_resid = n_items - self.n_teams - n_terms
+        se = np.sqrt(np.diagonal(cov, axis1=1, axis2=2) * n_items / df_resid)
+        return beta, se
+
+
+def randomization_inference(
+    df: pd.DataFrame,
+    n_perms: int = 20000,
+    seed: int = 2024,
+    chunk_size: int = 5000,
+):
+    """Studentized randomization p-values for every term in TERMS.
+
+    Returns a DataFrame indexed by term with the observed estimate, its HC1
+    SE and t-statistic, the mean and SD of the randomization distribution of
+    t, and two-sided / one-sided (greater) p-values of the form
+    (1 + #extreme) / (1 + n_valid). Each p-value tests the null that that
+    term's coefficient is zero.
+    """
+    rng = np.random.default_rng(seed)
+
+    team_codes = pd.factorize(df["team_id"])[0]
+    model = WithinTeamOLS(df["junior_talk_share"].to_numpy(), team_codes)
+
+    cond_obs = df["sequence_condition"].map(CONDITIONS.index).to_numpy()
+    acc_obs = df["accountability"].to_numpy()
+    beta_obs, se_obs = model.estimate(treatment_columns(cond_obs, acc_obs)[None])
+    beta_obs, se_obs = beta_obs[0], se_obs[0]
+    t_obs = beta_obs / se_obs
+
+    n_items = len(df)
+    n_ge_abs = np.zeros(len(TERMS))
+    n_ge = np.zeros(len(TERMS))
+    n_valid = np.zeros(len(TERMS))
+    total = np.zeros(len(TERMS))
+    total_sq = np.zeros(len(TERMS))
+
+    done = 0
+    while done < n_perms:
+        b = min(chunk_size, n_perms - done)
+        cond = rng.integers(0, len(CONDITIONS), size=(b, n_items))
+        acc = rng.integers(0, 2, size=(b, n_items))
+        beta, se = model.estimate(treatment_columns(cond, acc))
+        t = beta / se
+
+        valid = ~np.isnan(t)
+        n_valid += valid.sum(axis=0)
+        # Small tolerance so ties with the observed value count as extreme
+        n_ge_abs += (np.abs(t) >= np.abs(t_obs) - 1e-12).sum(axis=0)
+        n_ge += (t >= t_obs - 1e-12).sum(axis=0)
+        t = np.where(valid, t, 0.0)
+        total += t.sum(axis=0)
+        total_sq += (t ** 2).sum(axis=0)
+        done += b
+
+    mean = total / n_valid
+    sd = np.sqrt(np.maximum(total_sq / n_valid - mean ** 2, 0.0))
+
+    return pd.DataFrame(
+        dict(
+            estimate=beta_obs,
+            se_hc1=se_obs,
+            t_stat=t_obs,
+            null_mean_t=mean,
+            null_sd_t=sd,
+            p_two_sided=(1 + n_ge_abs) / (1 + n_valid),
+            p_greater=(1 + n_ge) / (1 + n_valid),
+            n_perms=n_valid.astype(int),
+        ),
+        index=pd.Index(TERMS, name="term"),
+    )
+
+
+def main(n_perms: int = 20000, seed: int = 2024):
+    os.makedirs("fig", exist_ok=True)
+
+    df = pd.read_csv("data/synthetic/study1_agenda_items_synthetic_full.csv")
+
+    start = time.perf_counter()
+    ri = randomization_inference(df, n_perms=n_perms, seed=seed)
+    elapsed = time.perf_counter() - start
+
+    out_path = "fig/randomization_inference_synthetic.csv"
+    ri.to_csv(out_path)
+
+    key = ri.loc["Human_first:accountability"]
+    lines = [
+        "Randomization inference (synthetic data)",
+        "========================================",
+        f"n_items: {len(df)}",
+        f"n_perms: {n_perms}",
+        f"seed: {seed}",
+        "",
+        "Statistic: coefficient / HC1 SE (team fixed effects), re-computed",
+        "for assignments re-drawn at the agenda-item level. Each row's p-value",
+        "tests the null that that coefficient is zero (exact under the sharp",
+        "null of no effect at all, asymptotically valid when other terms have",
+        "effects).",
+        "",
+        ri.to_string(float_format=lambda x: f"{x:.4f}"),
+        "",
+        f"Human_first x accountability: estimate {key['estimate']:.4f}, "
+        f"t = {key['t_stat']:.3f}, "
+        f"randomization p (two-sided) = {key['p_two_sided']:.4f}",
+    ]
+    with open("fig/randomization_inference_synthetic.txt", "w") as f:
+        f.write("\n".join(lines))
+
+    print("\n".join(lines))
+    print(f"\nElapsed (s): {elapsed:.2f}")
+    print(f"Saved randomization inference table to {out_path}")
+    print("Saved text summary to fig/randomization_inference_synthetic.txt")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,8 @@
 Orchestrator script to run the full synthetic pipeline:
 
 1. Generate agenda-level synthetic data (if scripts exist)
-2. Run descriptives and main regression
-3. Run power simulation
+2. Run descriptives, main regression and randomization inference
+3. Run power simulation and design comparison
 4. Generate turn-level synthetic data
 5. Train the critical-turn classifier
 
@@ -48,10 +48,19 @@ def main():
         if os.path.exists("code/analysis/main_regression_synthetic.py"):
             run("python3 code/analysis/main_regression_synthetic.py", log_f)
 
-        # 3. Power simulation
+        if os.path.exists("code/analysis/randomization_inference_synthetic.py"):
+            run("python3 code/analysis/randomization_inference_synthetic.py", log_f)
+
+        # 3. Power simulation and design comparison
         if os.path.exists("code/analysis/power_simulation_study1.py"):
             run("python3 code/analysis/power_simulation_study1.py", log_f)
 
+        if os.path.exists("code/analysis/power_simulation_secondary_study1.py"):
+            run("python3 code/analysis/power_simulation_secondary_study1.py", log_f)
+
+        if os.path.exists("code/analysis/power_comparison_study1.py"):
+            run("python3 code/analysis/power_comparison_study1.py", log_f)
+
         # 4. Turn-level synthetic data
         if os.path.exists("code/ml/generate_synthetic_turns.py"):
             run("python3 code/ml/generate_synthetic_turns.py", log_f)
@@ -0,0 +1,324 @@
+"""
+Local asyncio service for live critical-turn tagging during meetings.
+
+Wraps the saved classifier (models/critical_turn_classifier_synthetic.joblib)
+in a small TCP server. Clients send one JSON object per line and get one JSON
+object back per line:
+
+- {"op": "tag", "turn": {...}}
+    Turn fields follow data/synthetic/study1_turns_labeled_synthetic.csv
+    (at least agenda_item_id, text, and is_junior or speaker_role).
+    Response: {"ok": true, "agenda_item_id": ..., "p_critical": ...,
+               "is_critical": 0/1, "junior_critical_turns": <running count>}
+    A turn is counted at most once per (agenda_item_id, turn_id), so
+    client retries do not inflate the running count.
+- {"op": "counts"}
+    Running junior-critical counts per agenda item.
+- {"op": "metrics"}
+    Latency / throughput / batch-size metrics.
+
+Malformed requests, scoring failures and requests pending at shutdown get
+{"ok": false, "error": ...}; a request_id, if sent, is echoed in every reply.
+
+Turns arriving concurrently are grouped into micro-batches: a batch is scored
+as soon as it reaches max_batch_size, or max_wait_ms after its first turn
+arrived, whichever comes first. Scoring runs in a worker thread so the event
+loop keeps accepting turns.
+
+Usage (from the repository root):
+
+  python3 code/ml/critical_turn_service.py --port 8765
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import defaultdict
+
+import joblib
+import numpy as np
+
+
+MODEL_PATH = "models/critical_turn_classifier_synthetic.joblib"
+
+
+def parse_is_junior(turn: dict) -> bool:
+    """Junior flag from is_junior (0/1) or, failing that, speaker_role."""
+    if "is_junior" in turn:
+        value = turn["is_junior"]
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, (int, float)) and value in (0, 1):
+            return value == 1
+        if isinstance(value, str) and value.strip() in ("0", "1"):
+            return value.strip() == "1"
+        raise ValueError(f"is_junior must be 0 or 1, got {value!r}")
+    role = turn.get("speaker_role")
+    if not isinstance(role, str):
+        raise ValueError("turn needs is_junior (0/1) or a string speaker_role")
+    return role.startswith("junior")
+
+
+def validate_turn(turn) -> dict:
+    """Check a turn from a client; returns a copy with is_junior parsed.
+
+    Raises ValueError for anything the batch loop could not handle.
+    """
+    if not isinstance(turn, dict):
+        raise ValueError("turn must be a JSON object")
+    if not isinstance(turn.get("text"), str):
+        raise ValueError("turn needs a string text")
+    for key in ("agenda_item_id", "turn_id"):
+        value = turn.get(key)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (str, int))):
+            raise ValueError(f"{key} must be a string or integer")
+    turn = dict(turn)
+    turn["is_junior"] = parse_is_junior(turn)
+    return turn
+
+
+class ServiceMetrics:
+    """Rolling latency, batch-size and throughput counters."""
+
+    def __init__(self, window: int = 10000):
+        self.window = window
+        self.started = time.perf_counter()
+        self.n_requests = 0
+        self.n_batches = 0
+        self.latencies_ms = []
+        self.batch_sizes = []
+
+    def record_batch(self, latencies_ms):
+        self.n_batches += 1
+        self.n_requests += len(latencies_ms)
+        self.batch_sizes.append(len(latencies_ms))
+        self.latencies_ms.extend(latencies_ms)
+        # Keep only the most recent observations for percentiles
+        self.latencies_ms = self.latencies_ms[-self.window:]
+        self.batch_sizes = self.batch_sizes[-self.window:]
+
+    def snapshot(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        lat = np.array(self.latencies_ms) if self.latencies_ms else np.array([np.nan])
+        return dict(
+            n_requests=self.n_requests,
+            n_batches=self.n_batches,
+            uptime_s=elapsed,
+            throughput_per_s=self.n_requests / elapsed if elapsed > 0 else 0.0,
+            mean_batch_size=float(np.mean(self.batch_sizes)) if self.batch_sizes else 0.0,
+            latency_ms_p50=float(np.percentile(lat, 50)),
+            latency_ms_p95=float(np.percentile(lat, 95)),
+            latency_ms_p99=float(np.percentile(lat, 99)),
+            latency_ms_max=float(np.max(lat)),
+        )
+
+
+class CriticalTurnTagger:
+    """Micro-batching wrapper around the saved vectorizer + classifier."""
+
+    def __init__(
+        self,
+        model_path: str = MODEL_PATH,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        threshold: float = 0.5,
+    ):
+        bundle = joblib.load(model_path)
+        self.vectorizer = bundle["vectorizer"]
+        self.classifier = bundle["classifier"]
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_ms / 1000.0
+        self.threshold = threshold
+
+        self.junior_critical_counts = defaultdict(int)
+        # turn_ids already counted per agenda item, so client retries of the
+        # same turn do not inflate the running count
+        self._counted_turns = defaultdict(set)
+        self.metrics = ServiceMetrics()
+        self._queue = None
+        self._worker = None
+        self._in_flight = []
+        self._stopped = False
+
+    def score(self, texts):
+        X = self.vectorizer.transform(texts)
+        return self.classifier.predict_proba(X)[:, 1]
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._stopped = False
+        self._worker = asyncio.create_task(self._batch_loop())
+
+    async def stop(self):
+        """Stop the worker and fail every queued or in-flight request."""
+        self._stopped = True
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        error = RuntimeError("service is shutting down")
+        pending = list(self._in_flight)
+        self._in_flight = []
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, _, future in pending:
+            if not future.done():
+                future.set_exception(error)
+
+    async def tag(self, turn: dict) -> dict:
+        """Score one turn; `turn` must already have passed validate_turn()."""
+        if self._stopped or self._queue is None:
+            raise RuntimeError("service is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((turn, time.perf_counter(), future))
+        return await future
+
+    async def _next_batch(self):
+        # Collected straight into _in_flight so stop() can fail a batch that
+        # is still being gathered
+        batch = self._in_flight = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait_s
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _count(self, turn: dict, is_critical: int) -> int:
+        """Update and return the running junior-critical count for the turn's item."""
+        item = turn.get("agenda_item_id")
+        if is_critical and turn["is_junior"]:
+            turn_id = turn.get("turn_id")
+            if turn_id is None or turn_id not in self._counted_turns[item]:
+                if turn_id is not None:
+                    self._counted_turns[item].add(turn_id)
+                self.junior_critical_counts[item] += 1
+        return self.junior_critical_counts[item]
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            # Any failure is reported on this batch's futures; the loop
+            # itself must keep running for later requests.
+            try:
+                texts = [turn["text"] for turn, _, _ in batch]
+                probs = await loop.run_in_executor(None, self.score, texts)
+
+                done_at = time.perf_counter()
+                latencies = []
+                for (turn, arrived, future), p in zip(batch, probs):
+                    is_critical = int(p >= self.threshold)
+                    count = self._count(turn, is_critical)
+                    latencies.append((done_at - arrived) * 1000.0)
+                    if not future.done():
+                        future.set_result(
+                            dict(
+                                ok=True,
+                                agenda_item_id=turn.get("agenda_item_id"),
+                                turn_id=turn.get("turn_id"),
+                                p_critical=float(p),
+                                is_critical=is_critical,
+                                junior_critical_turns=count,
+                            )
+                        )
+                self.metrics.record_batch(latencies)
+            except Exception as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            # Not in a finally: if stop() cancels the worker mid-batch, the
+            # batch must stay in _in_flight for stop() to fail it
+            self._in_flight = []
+
+
+async def handle_client(tagger: CriticalTurnTagger, reader, writer):
+    write_lock = asyncio.Lock()
+
+    async def respond(payload: dict):
+        async with write_lock:
+            writer.write((json.dumps(payload) + "\n").encode())
+            await writer.drain()
+
+    async def handle_line(line: bytes):
+        msg = {}
+        try:
+            msg = json.loads(line)
+            if not isinstance(msg, dict):
+                msg = {}
+                raise ValueError("request must be a JSON object")
+            op = msg.get("op", "tag")
+            if op == "tag":
+                result = await tagger.tag(validate_turn(msg.get("turn")))
+            elif op == "counts":
+                result = dict(ok=True, counts=dict(tagger.junior_critical_counts))
+            elif op == "metrics":
+                result = dict(ok=True, **tagger.metrics.snapshot())
+            else:
+                result = dict(ok=False, error=f"unknown op: {op}")
+        except Exception as e:
+            result = dict(ok=False, error=str(e))
+        if "request_id" in msg:
+            result["request_id"] = msg["request_id"]
+        await respond(result)
+
+    # Requests on one connection may be pipelined; answer each as it is
+    # scored (clients match replies by request_id).
+    pending = set()
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            task = asyncio.create_task(handle_line(line))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.gather(*pending)
+    finally:
+        writer.close()
+
+
+async def start_server(tagger: CriticalTurnTagger, host: str, port: int):
+    await tagger.start()
+    return await asyncio.start_server(
+        lambda r, w: handle_client(tagger, r, w), host, port
+    )
+
+
+async def serve(host: str, port: int, max_batch_size: int, max_wait_ms: float):
+    tagger = CriticalTurnTagger(
+        max_batch_size=max_batch_size,
+        max_wait_ms=max_wait_ms,
+    )
+    server = await start_server(tagger, host, port)
+    print(f"Critical-turn service listening on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.max_batch_size, args.max_wait_ms))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Load generator for the critical-turn tagging service.
+
+Replays data/synthetic/study1_turns_labeled_synthetic.csv against
+critical_turn_service.py from several concurrent clients (one per "meeting
+room"), optionally at a fixed request rate, and reports client-side latency,
+throughput and the service's own metrics.
+
+By default the service is started in-process on a free port; pass --port to
+test a service that is already running.
+
+Output:
+- fig/critical_turn_service_load_test.txt
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from critical_turn_service import CriticalTurnTagger, start_server
+
+
+TURNS_PATH = "data/synthetic/study1_turns_labeled_synthetic.csv"
+
+
+async def run_client(host, port, turns, rate_per_s, latencies_ms):
+    reader, writer = await asyncio.open_connection(host, port)
+    sent_at = {}
+
+    async def receive(n):
+        for _ in range(n):
+            reply = json.loads(await reader.readline())
+            latencies_ms.append((time.perf_counter() - sent_at.pop(reply["request_id"])) * 1000.0)
+
+    receiver = asyncio.create_task(receive(len(turns)))
+    interval = 1.0 / rate_per_s if rate_per_s else 0.0
+    for i, turn in enumerate(turns):
+        sent_at[i] = time.perf_counter()
+        writer.write((json.dumps(dict(op="tag", request_id=i, turn=turn)) + "\n").encode())
+        await writer.drain()
+        if interval:
+            await asyncio.sleep(interval)
+    await receiver
+    writer.close()
+
+
+async def query(host, port, op):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write((json.dumps(dict(op=op)) + "\n").encode())
+    await writer.drain()
+    reply = json.loads(await reader.readline())
+    writer.close()
+    return reply
+
+
+async def run_load_test(host, port, n_clients, repeat, rate_per_s, max_batch_size, max_wait_ms):
+    server = None
+    tagger = None
+    if port is None:
+        tagger = CriticalTurnTagger(max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+        server = await start_server(tagger, host, 0)
+        port = server.sockets[0].getsockname()[1]
+
+    df = pd.read_csv(TURNS_PATH)
+    turns = df.to_dict(orient="records") * repeat
+    # Interleave turns across clients, as if meetings were running in parallel
+    per_client = [turns[i::n_clients] for i in range(n_clients)]
+
+    latencies_ms = []
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(run_client(host, port, t, rate_per_s, latencies_ms) for t in per_client)
+    )
+    elapsed = time.perf_counter() - start
+
+    metrics = await query(host, port, "metrics")
+    counts = await query(host, port, "counts")
+
+    if server is not None:
+        server.close()
+        await server.wait_closed()
+        await tagger.stop()
+
+    lat = np.array(latencies_ms)
+    return dict(
+        n_turns=len(lat),
+        n_clients=n_clients,
+        rate_per_client=rate_per_s,
+        elapsed_s=elapsed,
+        throughput_per_s=len(lat) / elapsed,
+        client_latency_ms_p50=np.percentile(lat, 50),
+        client_latency_ms_p95=np.percentile(lat, 95),
+        client_latency_ms_p99=np.percentile(lat, 99),
+        service_metrics=metrics,
+        n_agenda_items_with_junior_critical=len(counts["counts"]),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the critical-turn service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=None,
+                        help="connect to a running service instead of starting one")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=10,
+                        help="replay the turns file this many times")
+    parser.add_argument("--rate", type=float, default=100.0,
+                        help="requests per second per client (0 = as fast as possible)")
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    os.makedirs("fig", exist_ok=True)
+
+    res = asyncio.run(
+        run_load_test(
+            args.host,
+            args.port,
+            args.clients,
+            args.repeat,
+            args.rate,
+            args.max_batch_size,
+            args.max_wait_ms,
+        )
+    )
+    svc = res["service_metrics"]
+
+    lines = [
+        "Critical-turn service load test (synthetic turns)",
+        "=================================================",
+        f"n_turns: {res['n_turns']}",
+        f"n_clients: {res['n_clients']}",
+        f"rate per client (req/s, 0 = unthrottled): {res['rate_per_client']}",
+        f"max_batch_size: {args.max_batch_size}",
+        f"max_wait_ms: {args.max_wait_ms}",
+        "",
+        f"Elapsed (s): {res['elapsed_s']:.2f}",
+        f"Throughput (turns/s): {res['throughput_per_s']:.1f}",
+        f"Client latency p50/p95/p99 (ms): {res['client_latency_ms_p50']:.2f} / "
+        f"{res['client_latency_ms_p95']:.2f} / {res['client_latency_ms_p99']:.2f}",
+        "",
+        "Service metrics:",
+        f"  n_batches: {svc['n_batches']}",
+        f"  mean_batch_size: {svc['mean_batch_size']:.1f}",
+        f"  latency p50/p95/p99 (ms): {svc['latency_ms_p50']:.2f} / "
+        f"{svc['latency_ms_p95']:.2f} / {svc['latency_ms_p99']:.2f}",
+        f"  agenda items with junior critical turns: "
+        f"{res['n_agenda_items_with_junior_critical']}",
+    ]
+    with open("fig/critical_turn_service_load_test.txt", "w") as f:
+        f.write("\n".join(lines))
+
+    print("\n".join(lines))
+    print("\nSaved load test summary to fig/critical_turn_service_load_test.txt")
+
+
+if __name__ == "__main__":
+    main()